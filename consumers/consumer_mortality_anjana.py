@@ -4,32 +4,128 @@ consumer_mortality_anjana.py
 Mortality Analytics Consumer with Real-time Gender and Regional Visualization
 """
 
-import json
+import atexit
+import mmap
 import sqlite3
 import pathlib
-import time
+import sys
+import threading
 import os
+import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
-from collections import deque, defaultdict
+from collections import defaultdict
+from functools import lru_cache
 from typing import Optional, Dict, Any, List
 
-# Configuration
-DATA_FILE = pathlib.Path('data/project_live.json')
-DB_FILE = pathlib.Path('data/mortality_analytics.sqlite')
-HIGH_RATE_THRESHOLD = float(os.getenv("HIGH_RATE_THRESHOLD", 100))  # dynamic threshold
+import utils.utils_config as config
+from utils.utils_logger import logger
 
-# Real-time data storage
-mortality_rates = defaultdict(lambda: deque(maxlen=20))
-cause_gender_stats = defaultdict(lambda: defaultdict(list))
-cause_region_stats = defaultdict(lambda: defaultdict(list))
+# orjson is optional; it parses each JSONL line several times faster
+try:
+    from orjson import loads as _loads
+except ImportError:  # pragma: no cover
+    import json
+
+    # raw_decode skips the whitespace scans json.loads runs around each line
+    _raw_decode = json.JSONDecoder().raw_decode
+
+    def _loads(line: bytes):
+        return _raw_decode(line.decode("utf-8"))[0]
+
+# numba is optional; without it the window reductions run as plain Python
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover
+    def njit(*args, **kwargs):
+        return lambda fn: fn
+
+# Configuration (see utils/utils_config.py and .env)
+DATA_FILE: pathlib.Path = config.get_live_data_path()
+DB_FILE: pathlib.Path = config.get_analytics_db_path()
+HIGH_RATE_THRESHOLD: float = config.get_high_rate_threshold()
+TREND_CAUSE: str = config.get_trend_cause()
+POLL_INTERVAL_SECS = 2
+LOG_EVERY_N_MESSAGES = 1000
+
+TREND_WINDOW = 20
+
+
+class RateWindow:
+    """Fixed-size float32 ring buffer holding the most recent rates for one key."""
+
+    __slots__ = ("buf", "head", "n")
+
+    def __init__(self, size: int = TREND_WINDOW):
+        self.buf = np.zeros(size, dtype=np.float32)
+        self.head = 0
+        self.n = 0
+
+    def __len__(self) -> int:
+        return self.n
+
+    def append(self, rate: float) -> None:
+        size = len(self.buf)
+        self.buf[self.head] = rate
+        self.head = (self.head + 1) % size
+        self.n = min(self.n + 1, size)
+
+    def values(self) -> np.ndarray:
+        """Return the window oldest-first; a zero-copy view until it wraps."""
+        if self.n < len(self.buf):
+            return self.buf[:self.n]
+        return np.concatenate((self.buf[self.head:], self.buf[:self.head]))
+
+
+# Real-time data storage, written by the ingest thread and read by the
+# dashboard; both sides hold analytics_lock while touching it
+analytics_lock = threading.Lock()
+mortality_rates = defaultdict(RateWindow)
+cause_gender_stats = defaultdict(lambda: defaultdict(lambda: [0.0, 0]))  # [sum, count]
 high_mortality_count = 0
-processed_messages = set()
+processed_count = 0
+_regions_set: set = set()
+_regions_sorted: tuple = ()  # rebuilt only when a new region shows up
+_live_file = None  # handle on DATA_FILE kept open between polls
+_last_pos = 0  # byte offset of the first unread line in DATA_FILE
+# Rows already read from DATA_FILE whose insert failed; retried on the next poll.
+# Capped so a database that stays unavailable cannot grow it without bound.
+_pending_rows: list = []
+MAX_PENDING_ROWS = 100_000
+
+# Per-connection tuning; journal_mode=WAL is persisted in the file by init_db.
+# WAL lets readers see the last committed snapshot while the consumer writes,
+# and synchronous=NORMAL only fsyncs at checkpoints instead of every commit.
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+_CONN: Optional[sqlite3.Connection] = None
+
+
+def connect_db(db_file: pathlib.Path) -> sqlite3.Connection:
+    # Autocommit mode: process_batch drives its own BEGIN IMMEDIATE/COMMIT
+    conn = sqlite3.connect(db_file, isolation_level=None, check_same_thread=False)
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def get_conn() -> sqlite3.Connection:
+    # One long-lived connection to DB_FILE for the consumer; closed at interpreter exit
+    global _CONN
+    if _CONN is None:
+        _CONN = connect_db(DB_FILE)
+        atexit.register(_CONN.close)
+    return _CONN
 
 
 def init_db(db_file: pathlib.Path) -> None:
     conn = sqlite3.connect(db_file)
     cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS mortality_analytics (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -44,21 +140,43 @@ def init_db(db_file: pathlib.Path) -> None:
             processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
+    # Indices for grouped lookups by cause, plus a partial index for alerts
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_mort_cause_region ON mortality_analytics(cause, region)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_mort_cause_sex ON mortality_analytics(cause, sex)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_mort_high ON mortality_analytics(is_high_mortality) "
+        "WHERE is_high_mortality = 1"
+    )
     conn.commit()
     conn.close()
     print(f"Mortality analytics database initialized at {db_file}")
 
 
+@lru_cache(maxsize=4096)
+def _classify(region, status, sex, cause) -> tuple:
+    # The vocabulary is tiny, so every message shares the same interned key
+    # strings and the analytics dict lookups reuse their cached hashes
+    return tuple(sys.intern(v) if isinstance(v, str) else v for v in (region, status, sex, cause))
+
+
+def _as_text(value):
+    # Free-form text columns: store a number, list or object by its text form
+    return value if value is None or isinstance(value, str) else str(value)
+
+
 def extract_mortality_data(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     try:
+        region, status, sex, cause = _classify(
+            message.get("region"), message.get("status"), message.get("sex"), message.get("cause")
+        )
         return {
-            "region": message.get("region"),
-            "status": message.get("status"),
-            "sex": message.get("sex"),
-            "cause": message.get("cause"),
+            "region": region,
+            "status": status,
+            "sex": sex,
+            "cause": cause,
             "rate": float(message.get("rate", 0)),
             "se": float(message.get("se", 0)),
-            "timestamp": message.get("timestamp"),
+            "timestamp": _as_text(message.get("timestamp")),
             "author": message.get("author"),
         }
     except (ValueError, TypeError):
@@ -66,155 +184,387 @@ def extract_mortality_data(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         return None
 
 
-def process_and_store_message(message: Dict[str, Any], db_file: pathlib.Path) -> None:
-    global high_mortality_count
-    data = extract_mortality_data(message)
-    if not data:
-        return
-
-    region, status, sex, cause, rate, se = (
-        data["region"],
-        data["status"],
-        data["sex"],
-        data["cause"],
-        data["rate"],
-        data["se"],
-    )
-
-    is_high_mortality = rate >= HIGH_RATE_THRESHOLD
-
-    mortality_rates[(cause, region)].append(rate)
-    mortality_rates[(cause, sex)].append(rate)
-    cause_region_stats[cause][region].append(rate)
-    cause_gender_stats[cause][sex].append(rate)
-
-    if is_high_mortality:
-        high_mortality_count += 1
+INSERT_SQL = '''
+    INSERT INTO mortality_analytics
+    (region, status, sex, cause, rate, se, timestamp, is_high_mortality)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def parse_batch(lines: List[bytes]) -> List[tuple]:
+    rows = []
+    for line in lines:
+        try:
+            message = _loads(line)
+        except ValueError as e:
+            print(f"Error reading messages: {e}")
+            continue
+        if not isinstance(message, dict):
+            # Valid JSON but not a message object, e.g. 42 or [1, 2]
+            print(f"Error reading messages: expected a JSON object, got {type(message).__name__}")
+            continue
+        data = extract_mortality_data(message)
+        if not data:
+            continue
+        rows.append((
+            data["region"], data["status"], data["sex"], data["cause"],
+            data["rate"], data["se"], data["timestamp"],
+            data["rate"] >= HIGH_RATE_THRESHOLD,
+        ))
+    return rows
+
+
+def update_analytics(rows: List[tuple]) -> tuple:
+    # Called under analytics_lock, so only in-memory updates happen here; the
+    # alerts and the count before this batch are returned for report_batch
+    global high_mortality_count, processed_count, _regions_sorted
+    alerts = []
+    for row in rows:
+        region, status, sex, cause, rate, se, _timestamp, is_high_mortality = row
+        if region not in _regions_set:
+            _regions_set.add(region)
+            _regions_sorted = tuple(sorted(_regions_set, key=str))
+        mortality_rates[(cause, region)].append(rate)
+        mortality_rates[(cause, sex)].append(rate)
+        stats = cause_gender_stats[cause][sex]
+        stats[0] += rate
+        stats[1] += 1
+        if is_high_mortality:
+            alerts.append(row)
+    high_mortality_count += len(alerts)
+    processed_before = processed_count
+    processed_count += len(rows)
+    return alerts, processed_before
+
+
+def report_batch(rows: List[tuple], alerts: List[tuple], processed_before: int) -> None:
+    # Console and log output for a batch, done after analytics_lock is released
+    for region, status, sex, cause, rate, *_ in alerts:
         print(f"🚨 HIGH MORTALITY DETECTED: {region} {status} {sex} {cause}: Rate {rate}")
+    for region, status, sex, cause, rate, se, *_ in rows:
+        # Lazy arguments: loguru skips formatting while DEBUG is filtered out
+        logger.debug("{} {} {} {}: Rate {}, SE {}", region, status, sex, cause, rate, se)
+    first_milestone = (processed_before // LOG_EVERY_N_MESSAGES + 1) * LOG_EVERY_N_MESSAGES
+    for count in range(first_milestone, processed_before + len(rows) + 1, LOG_EVERY_N_MESSAGES):
+        logger.info(f"Processed {count} messages")
+
+
+# Errors caused by a row's own values; retrying the same row can never succeed
+UNSTORABLE_ROW_ERRORS = (
+    sqlite3.InterfaceError, sqlite3.ProgrammingError, sqlite3.DataError,
+    sqlite3.IntegrityError, OverflowError, TypeError, ValueError,
+)
+
+
+def store_rows(cursor: sqlite3.Cursor, rows: List[tuple], one_by_one: bool = False) -> List[tuple]:
+    # One transaction per call; rolled back on any failure so the connection
+    # is never left inside an open BEGIN
+    stored = rows
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        if one_by_one:
+            stored = []
+            for row in rows:
+                try:
+                    cursor.execute(INSERT_SQL, row)
+                except UNSTORABLE_ROW_ERRORS as e:
+                    print(f"⚠️ Skipping message that cannot be stored: {e}")
+                    continue
+                stored.append(row)
+        else:
+            cursor.executemany(INSERT_SQL, rows)
+        cursor.execute("COMMIT")
+    except BaseException:
+        if cursor.connection.in_transaction:
+            cursor.execute("ROLLBACK")
+        raise
+    return stored
+
+
+def process_batch(lines: List[bytes], cursor: sqlite3.Cursor) -> int:
+    # Parse the whole poll cycle first, store it with one executemany, then
+    # apply the in-memory analytics without touching the database
+    global _pending_rows
+    rows = _pending_rows + parse_batch(lines)
+    if not rows:
+        return 0
+    try:
+        try:
+            rows = store_rows(cursor, rows)
+        except UNSTORABLE_ROW_ERRORS:
+            # Some row cannot be bound: store the rest and drop just the bad ones
+            rows = store_rows(cursor, rows, one_by_one=True)
+    except sqlite3.OperationalError:
+        # Transient (busy, locked, disk I/O). The file offset has already moved
+        # past these lines, so keep the rows for the next poll
+        if len(rows) > MAX_PENDING_ROWS:
+            print(f"⚠️ Dropping {len(rows) - MAX_PENDING_ROWS} oldest unsaved messages")
+            rows = rows[-MAX_PENDING_ROWS:]
+        _pending_rows = rows
+        raise
+    except Exception:
+        # Not transient: retrying would fail the same way on every poll
+        print(f"⚠️ Dropping {len(rows)} messages that could not be stored")
+        _pending_rows = []
+        raise
+    _pending_rows = []
+    with analytics_lock:
+        alerts, processed_before = update_analytics(rows)
+    report_batch(rows, alerts, processed_before)
+    return len(rows)
+
+
+def ingest_loop(data_file: pathlib.Path, cursor: sqlite3.Cursor, stop: threading.Event) -> None:
+    # Runs off the GUI thread so file reads and database commits never stall a redraw
+    while not stop.is_set():
+        try:
+            process_batch(read_latest_lines(data_file), cursor)
+        except sqlite3.Error as e:
+            print(f"Error storing messages: {e}")
+        except Exception as e:
+            # Keep the thread alive: a dead ingest loop would silently freeze the dashboard
+            print(f"Error processing messages: {e}")
+        stop.wait(POLL_INTERVAL_SECS)
+
+
+def open_live_file(data_file: pathlib.Path):
+    global _live_file, _last_pos
+    try:
+        stat = os.stat(data_file)
+    except FileNotFoundError:
+        return None
 
-    conn = sqlite3.connect(db_file)
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO mortality_analytics 
-        (region, status, sex, cause, rate, se, timestamp, is_high_mortality)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        region, status, sex, cause, rate, se, data["timestamp"], is_high_mortality
-    ))
-    conn.commit()
-    conn.close()
-
-    print(f"📊 {region} {status} {sex} {cause}: Rate {rate}, SE {se}, Message: {message['message']}")
+    # Reopen if the file was replaced (a new inode: the producer restarted on
+    # POSIX) or truncated (its restart on Windows) and read it from the top
+    if _live_file is not None and (
+        stat.st_size < _last_pos
+        or not os.path.samestat(os.fstat(_live_file.fileno()), stat)
+    ):
+        _live_file.close()
+        _live_file = None
+    if _live_file is None:
+        _live_file = open(data_file, 'rb', buffering=0)
+        _last_pos = 0
+    return _live_file
+
+
+def read_latest_lines(data_file: pathlib.Path) -> List[bytes]:
+    global _last_pos
+    new_lines = []
+    try:
+        f = open_live_file(data_file)
+        if f is None or os.fstat(f.fileno()).st_size <= _last_pos:
+            return []
+        # Map the file only for this poll: the OS pages in just the new tail, and
+        # no mapping outlives the poll (on Windows a mapping blocks truncation;
+        # on POSIX the producer replaces the file, as truncating a mapped file
+        # under a reader can raise SIGBUS)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            while True:
+                nl = mm.find(b'\n', _last_pos)
+                if nl < 0:
+                    break  # partially written line, pick it up next poll
+                line = mm[_last_pos:nl + 1]
+                _last_pos = nl + 1
+                if not line.isspace():
+                    new_lines.append(line)
+    except (OSError, ValueError) as e:
+        print(f"Error reading messages: {e}")
 
+    return new_lines
 
-def read_latest_messages(data_file: pathlib.Path) -> List[Dict[str, Any]]:
-    global processed_messages
-    if not data_file.exists():
-        return []
 
-    new_messages = []
-    try:
-        with open(data_file, 'r') as f:
-            lines = f.readlines()
-        for line in lines:
-            if line.strip():
-                message = json.loads(line.strip())
-                msg_id = f"{message.get('author')}_{message.get('timestamp')}"
-                if msg_id not in processed_messages:
-                    new_messages.append(message)
-                    processed_messages.add(msg_id)
-    except Exception as e:
-        print(f"Error reading messages: {e}")
+BAR_WIDTH = 0.3
+TREND_X = np.arange(TREND_WINDOW)
 
-    return new_messages
+# Dashboard artists are created once and updated in place on every frame
+cause_bars: Dict[str, tuple] = {}  # cause -> (male bar, female bar, male label, female label)
+trend_lines: Dict[str, Any] = {}  # region -> Line2D
+dashboard_animation: Optional[animation.FuncAnimation] = None
 
 
 def setup_dynamic_plot():
     fig, (ax0, ax1) = plt.subplots(2, 1, figsize=(12, 18), constrained_layout=True)
     fig.suptitle('Real-time Mortality Analytics Dashboard', fontsize=18, fontweight='bold')
-    return fig, (ax0, ax1)
 
-
-def animate_dashboard(frame, fig, axes):
-    ax0, ax1 = axes
-    ax0.cla()
-    ax1.cla()
+    cause_bars.clear()
+    trend_lines.clear()
 
     # Chart 1: Mortality by Cause and Gender
     ax0.set_title('Average Mortality Rate by Cause and Gender', fontweight='bold')
     ax0.set_ylabel('Average Mortality Rate')
     ax0.set_xlabel('Cause')
+    ax0.grid(True, alpha=0.3, axis='y')
 
-    causes = list(cause_gender_stats.keys())
-    genders = ["Male", "Female"]
-
-    if causes:
-        bar_width = 0.3
-        index = range(len(causes))
-        male_rates = []
-        female_rates = []
+    # Chart 2: Trends for the cause of interest (Heart disease by default)
+    ax1.set_title(f'{TREND_CAUSE.title()} Mortality Rate Trends by HHS Region', fontweight='bold')
+    ax1.set_ylabel('Mortality Rate')
+    ax1.set_xlabel('Recent Readings')
+    ax1.grid(True, alpha=0.3)
+    return fig, (ax0, ax1)
 
-        for cause in causes:
-            male_avg = sum(cause_gender_stats[cause].get("Male", [])) / max(len(cause_gender_stats[cause].get("Male", [])), 1)
-            female_avg = sum(cause_gender_stats[cause].get("Female", [])) / max(len(cause_gender_stats[cause].get("Female", [])), 1)
-            male_rates.append(male_avg)
-            female_rates.append(female_avg)
 
-        # Bars
-        bars_male = ax0.bar([i - bar_width/2 for i in index], male_rates, width=bar_width, color='#4682B4', label='Male')
-        bars_female = ax0.bar([i + bar_width/2 for i in index], female_rates, width=bar_width, color='#FF69B4', label='Female')
+def average_rate(stats_by_sex: Dict[str, list], sex: str) -> float:
+    total, count = stats_by_sex.get(sex, (0.0, 0))
+    return total / max(count, 1)
+
+
+@njit(cache=True)
+def window_peak(values, n):
+    peak = 0.0
+    for i in range(n):
+        if values[i] > peak:
+            peak = values[i]
+    return peak
+
+
+def add_cause_bars(ax, cause: str) -> None:
+    i = len(cause_bars)
+    first = i == 0
+    # Animated artists stay out of full redraws; the animation blits them
+    male_bar = ax.bar(i - BAR_WIDTH/2, 0, width=BAR_WIDTH, color='#4682B4',
+                      label='Male' if first else '_nolegend_', animated=True)[0]
+    female_bar = ax.bar(i + BAR_WIDTH/2, 0, width=BAR_WIDTH, color='#FF69B4',
+                        label='Female' if first else '_nolegend_', animated=True)[0]
+    male_text = ax.text(i - BAR_WIDTH/2, 1, "", ha='center', fontsize=8, fontweight='bold',
+                        animated=True)
+    female_text = ax.text(i + BAR_WIDTH/2, 1, "", ha='center', fontsize=8, fontweight='bold',
+                          animated=True)
+    cause_bars[cause] = (male_bar, female_bar, male_text, female_text)
+
+
+def fit_ylim(ax, peak: float) -> bool:
+    # Rescale only when the data leaves the range or uses less than half of it,
+    # so most frames keep the cached background
+    top = ax.get_ylim()[1]
+    if peak and (peak > top or peak < top / 2):
+        ax.set_ylim(0, peak * 1.2)
+        return True
+    return False
+
+
+def refresh_background(fig) -> None:
+    # Limits, ticks or legends changed: redraw the static parts once and let
+    # the animation capture fresh blit backgrounds on this frame
+    fig.canvas.draw()
+    # FuncAnimation recaptures backgrounds by itself when an axes' limits change,
+    # but not for new legends or tick labels, and it has no public way to drop
+    # them; clear its cache only if this Matplotlib still has one
+    blit_cache = getattr(dashboard_animation, "_blit_cache", None)
+    if blit_cache is not None:
+        blit_cache.clear()
+
+
+def snapshot_analytics():
+    # Copy just the numbers the dashboard draws so the lock is held briefly
+    with analytics_lock:
+        bar_rates = [
+            (cause, average_rate(stats, "Male"), average_rate(stats, "Female"))
+            for cause, stats in cause_gender_stats.items()
+        ]
+        trends = [
+            (region, mortality_rates[(TREND_CAUSE, region)].values().copy())
+            for region in _regions_sorted
+            if mortality_rates.get((TREND_CAUSE, region))
+        ]
+        region_order = _regions_sorted
+    return bar_rates, trends, region_order
 
-        # Text labels for individual bars
-        for i, (m, f) in enumerate(zip(male_rates, female_rates)):
-            ax0.text(i - bar_width/2, m + 1, f"{m:.1f}", ha='center', fontsize=8, fontweight='bold')
-            ax0.text(i + bar_width/2, f + 1, f"{f:.1f}", ha='center', fontsize=8, fontweight='bold')
 
-    
-        ax0.set_xticks(index)
+def animate_dashboard(frame, fig, axes):
+    ax0, ax1 = axes
+    layout_changed = False
+    bar_rates, trends, region_order = snapshot_analytics()
+
+    # Chart 1: new causes get their bars once; existing bars only change height
+    causes = [cause for cause, _, _ in bar_rates]
+    if len(causes) > len(cause_bars):
+        for cause in causes[len(cause_bars):]:
+            add_cause_bars(ax0, cause)
+        ax0.set_xticks(range(len(causes)))
         ax0.set_xticklabels(causes, rotation=45, ha='right')
+        ax0.set_xlim(-0.5, len(causes) - 0.5)
         ax0.legend()
-        ax0.grid(True, alpha=0.3, axis='y')
+        layout_changed = True
+
+    bar_peak = 0.0
+    for cause, male_rate, female_rate in bar_rates:
+        male_bar, female_bar, male_text, female_text = cause_bars[cause]
+        for bar, text, rate in ((male_bar, male_text, male_rate), (female_bar, female_text, female_rate)):
+            bar.set_height(rate)
+            text.set_y(rate + 1)
+            text.set_text(f"{rate:.1f}")
+            bar_peak = max(bar_peak, rate)
+    layout_changed |= fit_ylim(ax0, bar_peak)
+
+    # Chart 2: one persistent line per region, fed with the latest window
+    new_region = False
+    peak = 0.0
+    longest = 0
+    for region, values in trends:
+        line = trend_lines.get(region)
+        if line is None:
+            (line,) = ax1.plot([], [], 'o-', label=region, animated=True)
+            trend_lines[region] = line
+            new_region = True
+        line.set_data(TREND_X[:len(values)], values)
+        peak = max(peak, window_peak(values, len(values)))
+        longest = max(longest, len(values))
+
+    if new_region:
+        ax1.legend(handles=[trend_lines[r] for r in region_order if r in trend_lines],
+                   loc='upper left', bbox_to_anchor=(1.01, 1), fontsize=9, title="HHS Region")
+        layout_changed = True
+    if longest and ax1.get_xlim() != (0, max(longest - 1, 1)):
+        ax1.set_xlim(0, max(longest - 1, 1))
+        layout_changed = True
+    # Shared y-range from the window peaks keeps the axis from jumping
+    layout_changed |= fit_ylim(ax1, peak)
+
+    if layout_changed:
+        refresh_background(fig)
+
+    artists = [artist for group in cause_bars.values() for artist in group]
+    artists.extend(trend_lines.values())
+    return artists
 
-    # Chart 2: Heart Disease Trends
-    ax1.set_title('Heart Disease Mortality Rate Trends by HHS Region', fontweight='bold')
-    ax1.set_ylabel('Mortality Rate')
-    ax1.set_xlabel('Recent Readings')
-
-    regions = sorted(set(region for cause in cause_region_stats for region in cause_region_stats[cause]))
-    for region in regions:
-        key = ("Heart disease", region)
-        if key in mortality_rates and mortality_rates[key]:
-            ax1.plot(range(len(mortality_rates[key])), mortality_rates[key], 'o-', label=region)
-
-    ax1.legend(loc='upper left', bbox_to_anchor=(1.01, 1), fontsize=9, title="HHS Region")
-    ax1.grid(True, alpha=0.3)
 
 def main():
+    global dashboard_animation
     print("=== Mortality Analytics Consumer ===")
     print(f"Reading from: {DATA_FILE}")
     print(f"Storing analytics in: {DB_FILE}")
     print(f"Using HIGH_RATE_THRESHOLD = {HIGH_RATE_THRESHOLD}")
+    print(f"Trending cause: {TREND_CAUSE}")
     print("Starting dynamic visualization... (Press Ctrl+C to stop)")
 
     init_db(DB_FILE)
     plt.ion()
     fig, axes = setup_dynamic_plot()
 
-    ani = animation.FuncAnimation(fig, animate_dashboard, fargs=(fig, axes),
-                                  interval=2000, cache_frame_data=False)
+    dashboard_animation = animation.FuncAnimation(fig, animate_dashboard, fargs=(fig, axes),
+                                                  interval=2000, blit=True, cache_frame_data=False)
+
+    stop = threading.Event()
+    ingest_thread = threading.Thread(
+        target=ingest_loop, args=(DATA_FILE, get_conn().cursor(), stop), daemon=True
+    )
+    ingest_thread.start()
 
     try:
+        # The main thread only runs the Matplotlib event loop
         while True:
-            messages = read_latest_messages(DATA_FILE)
-            for message in messages:
-                process_and_store_message(message, DB_FILE)
             plt.pause(0.1)
-            time.sleep(2)
 
     except KeyboardInterrupt:
         print("\n🛑 Consumer stopped by user")
     finally:
+        stop.set()
+        ingest_thread.join(timeout=POLL_INTERVAL_SECS + 5)
+        if _live_file is not None:
+            _live_file.close()
         plt.ioff()
+        logger.info(f"Processed {processed_count} messages")
         print(f"📈 Total high mortality events detected: {high_mortality_count}")
 
 
@@ -20,28 +20,130 @@ Example JSON message:
 }
 """
 
+import itertools
 import json
 import os
 import pathlib
+import queue
 import random
 import sys
+import threading
 import time
-from datetime import datetime
-from typing import Mapping, Any
-import csv
+from typing import Mapping, Any, NamedTuple
 import sqlite3
 
 import utils.utils_config as config
 from utils.utils_logger import logger
-from utils.emitters import file_emitter, sqlite_emitter
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pac
+except ImportError:  # fall back to pandas' C parser
+    pac = None
+
+try:
+    from orjson import dumps as _dumps
+except ImportError:  # fall back to the stdlib encoder
+    def _dumps(message: Mapping[str, Any]) -> bytes:
+        return json.dumps(message).encode("utf-8")
+
+# Resolved once at import: older utils_config versions do not define get_sqlite_path
+_get_sqlite_path = getattr(config, "get_sqlite_path", lambda: pathlib.Path("data/mortality.sqlite"))
+
+# Live file writes go through one large buffer that is flushed with each SQLite batch
+LIVE_FILE_BUFFER_BYTES = 1 << 20
+
+# SQLite batching: flush when the buffer fills or has been waiting too long,
+# so slow message intervals still land in the database promptly
+SQLITE_BATCH_SIZE = 1000
+SQLITE_FLUSH_INTERVAL_SECS = 5.0
+# Rows kept for retry while the database stays busy or locked; the oldest are dropped beyond this
+SQLITE_MAX_PENDING_ROWS = 100_000
+
+# Bounded hand-off between the generator and the writer thread; put() blocks when full
+WRITE_QUEUE_SIZE = SQLITE_BATCH_SIZE * 2
+# How long put() and shutdown wait on the writer before checking whether it is still running
+WRITER_TIMEOUT_SECS = 5.0
+
+# Per-connection tuning for the batcher, as in the consumer's CONNECTION_PRAGMAS; WAL is set by init_sqlite_db
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+)
+
+INSERT_MESSAGE_SQL = '''
+    INSERT INTO mortality_messages
+    (message, author, timestamp, category, region, status, sex, cause, rate, se)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+class _SqliteBatcher:
+    """Buffer producer rows and write them with one executemany per flush."""
+
+    def __init__(self, db_path: pathlib.Path, batch_size: int = SQLITE_BATCH_SIZE,
+                 flush_interval_secs: float = SQLITE_FLUSH_INTERVAL_SECS) -> None:
+        # Created on the main thread but only used by one thread at a time (the writer, then close)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        for pragma in CONNECTION_PRAGMAS:
+            self.conn.execute(pragma)
+        self.batch_size = batch_size
+        self.flush_interval_secs = flush_interval_secs
+        self.buf: list[tuple] = []
+        self.last_flush = time.monotonic()
+        self.retry_at = 0.0  # after a transient failure, no flush is due before this
+
+    def add(self, row: tuple) -> None:
+        self.buf.append(row)
+
+    def flush_due(self) -> bool:
+        """Return True once the buffer is full or has waited longer than the flush interval."""
+        now = time.monotonic()
+        if now < self.retry_at:
+            return False
+        return (len(self.buf) >= self.batch_size
+                or now - self.last_flush >= self.flush_interval_secs)
+
+    def flush(self) -> bool:
+        """Write buffered rows; returns False if the insert failed.
+
+        After an OperationalError (database busy or locked) the rows stay buffered
+        and are retried once the flush interval has passed, so SQLite catches up
+        with the live file; any other error drops the batch.
+        """
+        try:
+            if self.buf:
+                with self.conn:
+                    self.conn.executemany(INSERT_MESSAGE_SQL, self.buf)
+                logger.debug(f"Flushed {len(self.buf)} messages to SQLite")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite batch insert failed, will retry: {e}")
+            if len(self.buf) > SQLITE_MAX_PENDING_ROWS:
+                logger.error(f"Dropping {len(self.buf) - SQLITE_MAX_PENDING_ROWS} oldest unsaved messages")
+                del self.buf[:-SQLITE_MAX_PENDING_ROWS]
+            self.retry_at = time.monotonic() + self.flush_interval_secs
+            return False
+        except Exception as e:
+            logger.error(f"SQLite batch insert failed, dropping {len(self.buf)} messages: {e}")
+            self.buf.clear()
+            self.last_flush = time.monotonic()
+            return False
+        self.buf.clear()
+        self.last_flush = time.monotonic()
+        return True
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
 
 def init_sqlite_db(db_path: pathlib.Path) -> None:
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
-    
+    cursor.execute("PRAGMA journal_mode=WAL")
+    # Plain INTEGER PRIMARY KEY aliases the rowid, so inserts skip the sqlite_sequence update
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS mortality_messages (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id INTEGER PRIMARY KEY,
             message TEXT,
             author TEXT,
             timestamp TEXT,
@@ -58,78 +160,161 @@ def init_sqlite_db(db_path: pathlib.Path) -> None:
     conn.close()
     logger.info(f"SQLite database initialized at {db_path}")
 
-def load_mortality_data(csv_path: str) -> list[dict]:
-    data = []
-    with open(csv_path, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            data.append({
-                "region": row["Region"],
-                "status": row["Status"],
-                "sex": row["Sex"],
-                "cause": row["Cause"],
-                "rate": float(row["Rate"]),
-                "se": float(row["SE"])
-            })
-    return data
-
-def generate_mortality_messages(csv_path: str):
-    mortality_data = load_mortality_data(csv_path)
-
-    MESSAGE_TEMPLATES = [
-        "In {region}, {status} {sex} population reported {cause} mortality at {rate} (SE {se}).",
-        "{region} {status} {sex}s observed a {cause} death rate of {rate}, SE {se}.",
-        "{cause} mortality in {region} for {status} {sex}s: {rate} with SE {se}.",
-        "{region} records {rate} deaths per 100,000 from {cause} among {status} {sex}s (SE {se}).",
-        "For {status} {sex}s in {region}, {cause} mortality rate is {rate} (SE {se}).",
-        "{sex} residents in {status} {region} face a {cause} death rate of {rate} ± {se}.",
-        "{cause} claims {rate} per 100,000 {status} {sex}s in {region}, SE {se}.",
-        "{region}'s {status} {sex} population has a {cause} mortality rate of {rate} (SE {se})."
-    ]
-
-    message_count = 0
-    base_time = datetime(2025, 9, 27, 23, 44, 0)
-    
+CSV_COLUMNS = ("Region", "Status", "Sex", "Cause", "Rate", "SE")
+
+def _read_csv_columns(csv_path: str) -> tuple[list, ...]:
+    if pac is not None:
+        table = pac.read_csv(
+            csv_path,
+            convert_options=pac.ConvertOptions(
+                include_columns=list(CSV_COLUMNS),
+                column_types={"Rate": pa.float64(), "SE": pa.float64()},
+            ),
+        )
+        columns = table.to_pydict()
+        return tuple(columns[name] for name in CSV_COLUMNS)
+
+    # Imported here so producer startup only pays for pandas when pyarrow is missing
+    import pandas as pd
+
+    df = pd.read_csv(csv_path, usecols=list(CSV_COLUMNS), dtype={"Rate": "float64", "SE": "float64"})
+    return tuple(df[name].to_list() for name in CSV_COLUMNS)
+
+class MortalityData(NamedTuple):
+    """CSV rows stored column-wise, one list per field."""
+    regions: list[str]
+    statuses: list[str]
+    sexes: list[str]
+    causes: list[str]
+    rates: list[float]
+    ses: list[float]
+    authors: list[str]
+    categories: list[str]
+
+def load_mortality_data(csv_path: str) -> MortalityData:
+    regions, statuses, sexes, causes, rates, ses = _read_csv_columns(csv_path)
+    return MortalityData(
+        regions, statuses, sexes, causes, rates, ses,
+        # Derived once per row here instead of on every emitted message, and interned
+        # so rows sharing a region or cause share one string object
+        authors=[sys.intern(region.replace(" ", "_")) for region in regions],
+        categories=[sys.intern(cause.lower().replace(" ", "_")) for cause in causes],
+    )
+
+BASE_DATE = "2025-09-27"
+
+# Every minute of the simulated day, formatted once; message N uses TIMESTAMPS[N % 1440]
+TIMESTAMPS = tuple(f"{BASE_DATE} {hour:02d}:{minute:02d}:00" for hour in range(24) for minute in range(60))
+
+# Message templates as prebuilt f-string functions, so no template is re-parsed per message
+TEMPLATE_FNS = (
+    lambda region, status, sex, cause, rate, se: f"In {region}, {status} {sex} population reported {cause} mortality at {rate} (SE {se}).",
+    lambda region, status, sex, cause, rate, se: f"{region} {status} {sex}s observed a {cause} death rate of {rate}, SE {se}.",
+    lambda region, status, sex, cause, rate, se: f"{cause} mortality in {region} for {status} {sex}s: {rate} with SE {se}.",
+    lambda region, status, sex, cause, rate, se: f"{region} records {rate} deaths per 100,000 from {cause} among {status} {sex}s (SE {se}).",
+    lambda region, status, sex, cause, rate, se: f"For {status} {sex}s in {region}, {cause} mortality rate is {rate} (SE {se}).",
+    lambda region, status, sex, cause, rate, se: f"{sex} residents in {status} {region} face a {cause} death rate of {rate} ± {se}.",
+    lambda region, status, sex, cause, rate, se: f"{cause} claims {rate} per 100,000 {status} {sex}s in {region}, SE {se}.",
+    lambda region, status, sex, cause, rate, se: f"{region}'s {status} {sex} population has a {cause} mortality rate of {rate} (SE {se}).",
+)
+
+# Template picks are drawn in blocks of this size rather than one RNG call per message
+TEMPLATE_PICK_BUFFER = 4096
+
+def generate_mortality_messages(csv_path: str, seed: int | None = None):
+    regions, statuses, sexes, causes, rates, ses, authors, categories = load_mortality_data(csv_path)
+
+    # Module globals and bound methods used per message, bound to locals once
+    templates = TEMPLATE_FNS
+    n_templates = len(templates)
+    pick_buffer = TEMPLATE_PICK_BUFFER
+    timestamps = TIMESTAMPS
+    n_timestamps = len(timestamps)
+    dumps = _dumps
+    choices = random.Random(seed).choices
+    template_indices = range(n_templates)
+    picks = choices(template_indices, k=pick_buffer)
+    pick_pos = 0
+
+    # Cycle over row indices forever; stops immediately if the CSV has no rows
+    for message_count, i in enumerate(itertools.cycle(range(len(regions)))):
+        region = regions[i]
+        status = statuses[i]
+        sex = sexes[i]
+        cause = causes[i]
+        rate = rates[i]
+        se = ses[i]
+
+        if pick_pos == pick_buffer:
+            picks = choices(template_indices, k=pick_buffer)
+            pick_pos = 0
+        message_text = templates[picks[pick_pos]](region, status, sex, cause, rate, se)
+        pick_pos += 1
+
+        # One simulated minute per message on a fixed day
+        timestamp_str = timestamps[message_count % n_timestamps]
+
+        author = authors[i]
+        category = categories[i]
+
+        # Each sink gets its native form: a JSON line for the live file, a tuple for SQLite
+        line = dumps({
+            "message": message_text,
+            "author": author,
+            "timestamp": timestamp_str,
+            "category": category,
+            "region": region,
+            "status": status,
+            "sex": sex,
+            "cause": cause,
+            "rate": rate,
+            "se": se
+        }) + b"\n"
+        row = (message_text, author, timestamp_str, category, region, status, sex, cause, rate, se)
+
+        yield line, row
+
+def emit_to_file(line: bytes, *, fh) -> None:
+    fh.write(line)
+
+def emit_to_sqlite(row: tuple, *, batcher: _SqliteBatcher) -> None:
+    batcher.add(row)
+
+def _writer(write_queue: queue.Queue, live_file, batcher: _SqliteBatcher) -> None:
+    """Drain queued (line, row) pairs into the live file and SQLite until a None sentinel arrives."""
+    while True:
+        try:
+            item = write_queue.get(timeout=batcher.flush_interval_secs)
+        except queue.Empty:
+            # Idle: push out anything still buffered so the consumer is not left waiting
+            try:
+                batcher.flush()
+                live_file.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush buffered messages: {e}")
+            continue
+        if item is None:
+            break
+        line, row = item
+        try:
+            emit_to_file(line, fh=live_file)
+            emit_to_sqlite(row, batcher=batcher)
+            if batcher.flush_due():
+                # Flush both sinks together so the consumer sees rows on the batch cadence
+                batcher.flush()
+                live_file.flush()
+        except Exception as e:
+            logger.error(f"Failed to write message: {e}")
+
+def _enqueue(write_queue: queue.Queue, item, writer: threading.Thread) -> None:
+    """Put an item on the writer queue, giving up if the writer thread has stopped."""
     while True:
-        for record in mortality_data:
-            region = record["region"]
-            status = record["status"]
-            sex = record["sex"]
-            cause = record["cause"]
-            rate = record["rate"]
-            se = record["se"]
-
-            message_text = random.choice(MESSAGE_TEMPLATES).format(
-                region=region, status=status, sex=sex, cause=cause, rate=rate, se=se
-            )
-
-            timestamp = base_time.replace(minute=(message_count % 60), 
-                                          hour=(message_count // 60) % 24)
-            timestamp_str = timestamp.strftime("%Y-%m-%d %H:%M:%S")
-
-            category = cause.lower().replace(" ", "_")
-
-            message = {
-                "message": message_text,
-                "author": f"{region.replace(' ', '_')}",
-                "timestamp": timestamp_str,
-                "category": category,
-                "region": region,
-                "status": status,
-                "sex": sex,
-                "cause": cause,
-                "rate": rate,
-                "se": se
-            }
-
-            yield message
-            message_count += 1
-
-def emit_to_file(message: Mapping[str, Any], *, path: pathlib.Path) -> bool:
-    return file_emitter.emit_message(message, path=path)
-
-def emit_to_sqlite(message: Mapping[str, Any], *, db_path: pathlib.Path) -> bool:
-    return sqlite_emitter.emit_message(message, db_path=db_path)
+        try:
+            write_queue.put(item, timeout=WRITER_TIMEOUT_SECS)
+            return
+        except queue.Full:
+            if not writer.is_alive():
+                raise RuntimeError("writer thread stopped; messages can no longer be written")
 
 def main() -> None:
     logger.info("Starting Mortality Data Producer")
@@ -139,42 +324,77 @@ def main() -> None:
     try:
         interval_secs: int = config.get_message_interval_seconds_as_int()
         live_data_path: pathlib.Path = config.get_live_data_path()
-        sqlite_path: pathlib.Path = config.get_sqlite_path() if hasattr(config, "get_sqlite_path") else pathlib.Path("data/mortality.sqlite")
+        sqlite_path: pathlib.Path = _get_sqlite_path()
     except Exception as e:
         logger.error(f"Failed to read environment variables: {e}")
         sys.exit(1)
 
     try:
         init_sqlite_db(sqlite_path)
+        batcher = _SqliteBatcher(sqlite_path)
     except Exception as e:
         logger.error(f"Failed to initialize SQLite database: {e}")
         sys.exit(2)
 
     try:
-        if live_data_path.exists():
-            live_data_path.unlink()
         os.makedirs(live_data_path.parent, exist_ok=True)
+        # On POSIX start a new file so a running consumer sees a new inode and rereads
+        # from the top; truncating in place could also fault a consumer mid-read.
+        # Windows cannot delete a file the consumer holds open, so truncate there.
+        if os.name == "posix":
+            live_data_path.unlink(missing_ok=True)
+        live_file = open(live_data_path, "wb", buffering=LIVE_FILE_BUFFER_BYTES)
     except Exception as e:
         logger.error(f"Failed to prep live data file: {e}")
         sys.exit(3)
 
+    write_queue: queue.Queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+    writer = threading.Thread(
+        target=_writer, args=(write_queue, live_file, batcher), name="mortality-writer", daemon=True
+    )
+    writer.start()
+
     try:
         csv_path = "data/USRegionalMortality.csv"
         if not pathlib.Path(csv_path).exists():
             logger.error(f"CSV file {csv_path} not found")
             sys.exit(4)
 
-        for message in generate_mortality_messages(csv_path):
-            logger.info(f"{message['region']} {message['status']} {message['sex']} {message['cause']}: Rate {message['rate']}, SE {message['se']}")
-            emit_to_file(message, path=live_data_path)
-            emit_to_sqlite(message, db_path=sqlite_path)
-            time.sleep(interval_secs)
+        next_emit = time.monotonic()
+        for line, row in generate_mortality_messages(csv_path):
+            logger.debug("{} {} {} {}: Rate {}, SE {}", *row[4:])
+            _enqueue(write_queue, (line, row), writer)
+            if interval_secs > 0:
+                # Pace against a deadline so logging and queueing time do not add to the interval
+                next_emit += interval_secs
+                delay = next_emit - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_emit = time.monotonic()
 
     except KeyboardInterrupt:
         logger.warning("Mortality Producer interrupted by user.")
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
     finally:
+        # A dead or stuck writer must not hang shutdown; close() still flushes what a dead one left
+        if writer.is_alive():
+            try:
+                write_queue.put(None, timeout=WRITER_TIMEOUT_SECS)
+            except queue.Full:
+                logger.error("Writer thread is not draining its queue.")
+            writer.join(timeout=WRITER_TIMEOUT_SECS)
+        if writer.is_alive():
+            # Still using the file and batcher: leave them to the daemon thread
+            # rather than closing them underneath it
+            logger.error("Writer thread did not stop; buffered messages may be lost.")
+        else:
+            try:
+                live_file.close()
+            except OSError as e:
+                logger.error(f"Failed to close live data file: {e}")
+            batcher.close()
         logger.info("Mortality Producer shutting down.")
 
 if __name__ == "__main__":
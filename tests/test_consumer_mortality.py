@@ -0,0 +1,442 @@
+"""
+tests/test_consumer_mortality.py
+
+Lightweight tests for the mortality analytics consumer.
+Uses temp paths so the live data file and database are never touched.
+
+Usage:
+  pytest -q
+"""
+
+#####################################
+# Imports
+#####################################
+
+import json
+import pathlib
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from consumers import consumer_mortality_anjana as consumer
+
+#####################################
+# Helper Functions
+#####################################
+
+
+def _message(region: str, sex: str, rate: float, minute: int) -> dict:
+    return {
+        "message": f"{region} {sex} heart disease mortality at {rate}.",
+        "author": region.replace(" ", "_"),
+        "timestamp": f"2025-09-27 00:{minute:02d}:00",
+        "category": "heart_disease",
+        "region": region,
+        "status": "Urban",
+        "sex": sex,
+        "cause": "Heart disease",
+        "rate": rate,
+        "se": 1.0,
+    }
+
+
+@pytest.fixture
+def fresh_reader(monkeypatch):
+    """Reset the consumer's live-file position and close its handle afterwards."""
+    monkeypatch.setattr(consumer, "_live_file", None)
+    monkeypatch.setattr(consumer, "_last_pos", 0)
+    yield
+    if consumer._live_file is not None:
+        consumer._live_file.close()
+
+
+def _lines(*messages: dict) -> list:
+    return [json.dumps(message).encode("utf-8") + b"\n" for message in messages]
+
+
+def _read(live: pathlib.Path) -> list:
+    return [json.loads(line) for line in consumer.read_latest_lines(live)]
+
+
+#####################################
+# SQLite Storage
+#####################################
+
+
+def test_process_batch_stores_all_rows(tmp_path: pathlib.Path):
+    db_path = tmp_path / "analytics.sqlite"
+    consumer.init_db(db_path)
+    messages = [
+        _message("HHS Region 01", "Male", 188.2, 0),
+        _message("HHS Region 01", "Female", 42.0, 1),
+        _message("HHS Region 02", "Male", 150.5, 2),
+    ]
+
+    conn = consumer.connect_db(db_path)
+    try:
+        assert consumer.process_batch(_lines(*messages), conn.cursor()) == 3
+        (count,) = conn.execute("SELECT COUNT(*) FROM mortality_analytics;").fetchone()
+        (high,) = conn.execute(
+            "SELECT COUNT(*) FROM mortality_analytics WHERE is_high_mortality = 1;"
+        ).fetchone()
+    finally:
+        conn.close()
+
+    assert count == 3
+    assert high == 2
+
+
+def test_process_batch_retries_rows_after_failed_insert(tmp_path: pathlib.Path, monkeypatch):
+    monkeypatch.setattr(consumer, "_pending_rows", [])
+    db_path = tmp_path / "analytics.sqlite"
+    conn = consumer.connect_db(db_path)  # table is missing until init_db runs
+    try:
+        with pytest.raises(consumer.sqlite3.Error):
+            consumer.process_batch(_lines(_message("HHS Region 01", "Male", 188.2, 0)), conn.cursor())
+        assert not conn.in_transaction
+        assert len(consumer._pending_rows) == 1
+
+        consumer.init_db(db_path)
+        assert consumer.process_batch(_lines(_message("HHS Region 02", "Male", 150.5, 1)), conn.cursor()) == 2
+        (count,) = conn.execute("SELECT COUNT(*) FROM mortality_analytics;").fetchone()
+    finally:
+        conn.close()
+
+    assert count == 2
+    assert consumer._pending_rows == []
+
+
+def test_process_batch_drops_only_unstorable_rows(tmp_path: pathlib.Path, monkeypatch):
+    good = ("HHS Region 01", "Urban", "Male", "Store test", 80.0, 1.0, "2025-09-27 00:00:00", False)
+    unbindable = good[:6] + (["x"], False)
+    too_big = good[:6] + (10 ** 19, False)
+    monkeypatch.setattr(consumer, "_pending_rows", [unbindable, too_big, good])
+    db_path = tmp_path / "analytics.sqlite"
+    consumer.init_db(db_path)
+
+    conn = consumer.connect_db(db_path)
+    try:
+        assert consumer.process_batch([], conn.cursor()) == 1
+        assert not conn.in_transaction
+        assert consumer._pending_rows == []
+        assert consumer.process_batch(_lines(_message("HHS Region 02", "Male", 150.5, 1)), conn.cursor()) == 1
+        (count,) = conn.execute("SELECT COUNT(*) FROM mortality_analytics;").fetchone()
+    finally:
+        conn.close()
+
+    assert count == 2
+
+
+def test_extract_mortality_data_stores_non_text_timestamp_as_text():
+    message = _message("HHS Region 01", "Male", 188.2, 0)
+    message["timestamp"] = ["x"]
+    assert consumer.extract_mortality_data(message)["timestamp"] == "['x']"
+
+
+def test_parse_batch_skips_malformed_lines():
+    good = _message("HHS Region 01", "Male", 188.2, 0)
+    rows = consumer.parse_batch([b"{not json\n", b"42\n", b"[1, 2]\n", b"null\n"] + _lines(good))
+
+    assert rows == [(
+        "HHS Region 01", "Urban", "Male", "Heart disease", 188.2, 1.0,
+        "2025-09-27 00:00:00", True,
+    )]
+
+
+def test_init_db_enables_wal(tmp_path: pathlib.Path):
+    db_path = tmp_path / "analytics.sqlite"
+    consumer.init_db(db_path)
+
+    conn = consumer.connect_db(db_path)
+    try:
+        (mode,) = conn.execute("PRAGMA journal_mode;").fetchone()
+        (sync,) = conn.execute("PRAGMA synchronous;").fetchone()
+    finally:
+        conn.close()
+
+    assert mode == "wal"
+    assert sync == 1  # NORMAL
+
+
+def test_init_db_creates_query_indices(tmp_path: pathlib.Path):
+    db_path = tmp_path / "analytics.sqlite"
+    consumer.init_db(db_path)
+    consumer.init_db(db_path)  # idempotent on an existing database
+
+    conn = consumer.connect_db(db_path)
+    try:
+        names = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'mortality_analytics';"
+        )}
+    finally:
+        conn.close()
+
+    assert {"idx_mort_cause_region", "idx_mort_cause_sex", "idx_mort_high"} <= names
+
+
+def test_extract_mortality_data_interns_categories():
+    first = consumer.extract_mortality_data(_message("HHS Region 03", "Male", 10.0, 0))
+    other = _message("HHS Region 03", "Male", 20.0, 1)
+    other["region"] = "".join(["HHS Region ", "03"])  # equal but distinct object
+    second = consumer.extract_mortality_data(other)
+
+    assert first["region"] is second["region"]
+    assert consumer.extract_mortality_data({"region": ["not", "hashable"]}) is None
+
+
+#####################################
+# Running Statistics
+#####################################
+
+
+def test_average_rate_uses_running_sum_and_count(tmp_path: pathlib.Path):
+    db_path = tmp_path / "analytics.sqlite"
+    consumer.init_db(db_path)
+    messages = [
+        _message("HHS Region 01", "Male", 100.0, 0),
+        _message("HHS Region 02", "Male", 200.0, 1),
+        _message("HHS Region 01", "Female", 50.0, 2),
+    ]
+    for message in messages:
+        message["cause"] = "Average test"  # keep apart from other tests' stats
+
+    conn = consumer.connect_db(db_path)
+    try:
+        consumer.process_batch(_lines(*messages), conn.cursor())
+    finally:
+        conn.close()
+
+    stats = consumer.cause_gender_stats["Average test"]
+    assert consumer.average_rate(stats, "Male") == 150.0
+    assert consumer.average_rate(stats, "Female") == 50.0
+    assert consumer.average_rate(stats, "Unknown") == 0.0
+
+
+def test_process_batch_reports_outside_analytics_lock(tmp_path: pathlib.Path, monkeypatch):
+    held = []
+    monkeypatch.setattr(consumer, "report_batch", lambda *args: held.append(consumer.analytics_lock.locked()))
+    db_path = tmp_path / "analytics.sqlite"
+    consumer.init_db(db_path)
+
+    conn = consumer.connect_db(db_path)
+    try:
+        consumer.process_batch(_lines(_message("HHS Region 01", "Male", 188.2, 0)), conn.cursor())
+    finally:
+        conn.close()
+
+    assert held == [False]
+
+
+def test_update_analytics_returns_alerts_and_prior_count():
+    before = consumer.processed_count
+    high = ("HHS Region 06", "Urban", "Male", "Alert test", 500.0, 1.0, "t", True)
+    low = ("HHS Region 06", "Urban", "Female", "Alert test", 5.0, 1.0, "t", False)
+    with consumer.analytics_lock:
+        alerts, processed_before = consumer.update_analytics([high, low])
+
+    assert alerts == [high]
+    assert processed_before == before
+    assert consumer.processed_count == before + 2
+
+
+def test_rate_window_keeps_latest_rates_in_order():
+    window = consumer.RateWindow(size=3)
+    assert len(window) == 0
+    for rate in (1.0, 2.0):
+        window.append(rate)
+    assert window.values().tolist() == [1.0, 2.0]
+
+    for rate in (3.0, 4.0, 5.0):
+        window.append(rate)
+    assert len(window) == 3
+    assert window.values().tolist() == [3.0, 4.0, 5.0]
+
+
+def test_window_peak_finds_largest_rate():
+    values = np.array([120.5, 188.2, 42.0, 0.0], dtype=np.float32)
+    assert consumer.window_peak(values, 3) == pytest.approx(188.2, rel=1e-6)
+    assert consumer.window_peak(values[:0], 0) == 0.0
+
+
+#####################################
+# Dashboard
+#####################################
+
+
+def test_animate_dashboard_reuses_artists(tmp_path: pathlib.Path):
+    db_path = tmp_path / "analytics.sqlite"
+    consumer.init_db(db_path)
+    conn = consumer.connect_db(db_path)
+    fig, axes = consumer.setup_dynamic_plot()
+    try:
+        consumer.process_batch(_lines(_message("HHS Region 09", "Male", 120.0, 0)), conn.cursor())
+        consumer.animate_dashboard(0, fig, axes)
+        line = consumer.trend_lines["HHS Region 09"]
+        bars = consumer.cause_bars["Heart disease"]
+
+        consumer.process_batch(_lines(_message("HHS Region 09", "Male", 140.0, 1)), conn.cursor())
+        artists = consumer.animate_dashboard(1, fig, axes)
+    finally:
+        conn.close()
+        consumer.plt.close(fig)
+
+    assert consumer.trend_lines["HHS Region 09"] is line
+    assert line in artists and all(a.get_animated() for a in artists)
+    assert consumer.cause_bars["Heart disease"] is bars
+    assert list(line.get_ydata())[-2:] == [120.0, 140.0]
+    assert bars[0].get_height() == consumer.average_rate(
+        consumer.cause_gender_stats["Heart disease"], "Male"
+    )
+
+
+def test_blitted_animation_recaptures_background_on_layout_change(monkeypatch):
+    fig, axes = consumer.setup_dynamic_plot()
+    anim = consumer.animation.FuncAnimation(fig, consumer.animate_dashboard, fargs=(fig, axes),
+                                            interval=2000, blit=True, cache_frame_data=False)
+    monkeypatch.setattr(consumer, "dashboard_animation", anim)
+    refreshes = []
+    real_refresh = consumer.refresh_background
+    monkeypatch.setattr(consumer, "refresh_background", lambda f: refreshes.append(f) or real_refresh(f))
+
+    def step():
+        # Fire the animation's timer callbacks the way a GUI event loop would
+        for func, args, kwargs in anim.event_source.callbacks:
+            func(*args, **kwargs)
+
+    try:
+        with consumer.analytics_lock:
+            consumer.update_analytics([("HHS Region 07", "Urban", "Male", "Blit test", 80.0, 1.0, "t", False)])
+        fig.canvas.draw()  # starts the animation
+        step()
+        assert anim._blit_cache
+
+        with consumer.analytics_lock:
+            consumer.update_analytics([("HHS Region 07", "Urban", "Female", "Blit test two", 90.0, 1.0, "t", False)])
+        refreshes.clear()
+        step()
+    finally:
+        anim.event_source.stop()
+        consumer.plt.close(fig)
+
+    assert refreshes == [fig]
+    assert anim._blit_cache  # backgrounds captured again after the redraw
+    assert "Blit test two" in consumer.cause_bars
+
+
+def test_refresh_background_tolerates_animation_without_blit_cache(monkeypatch):
+    fig, _ = consumer.setup_dynamic_plot()
+    monkeypatch.setattr(consumer, "dashboard_animation", object())
+    try:
+        consumer.refresh_background(fig)
+    finally:
+        consumer.plt.close(fig)
+
+
+#####################################
+# Live File Tailing
+#####################################
+
+
+def test_read_latest_lines_only_returns_new_lines(tmp_path: pathlib.Path, fresh_reader):
+    live = tmp_path / "live.json"
+    first = _message("HHS Region 01", "Male", 188.2, 0)
+    second = _message("HHS Region 02", "Female", 42.0, 1)
+
+    live.write_text(json.dumps(first) + "\n", encoding="utf-8")
+    assert _read(live) == [first]
+    assert _read(live) == []
+
+    # A line without its newline is still being written by the producer
+    line = json.dumps(second)
+    with live.open("a", encoding="utf-8") as f:
+        f.write(line[:10])
+    assert _read(live) == []
+    with live.open("a", encoding="utf-8") as f:
+        f.write(line[10:] + "\n")
+    assert _read(live) == [second]
+
+
+def test_read_latest_lines_restarts_after_truncation(tmp_path: pathlib.Path, fresh_reader):
+    live = tmp_path / "live.json"
+    first = _message("HHS Region 01", "Male", 188.2, 0)
+    second = _message("HHS Region 02", "Female", 42.0, 1)
+
+    live.write_text(json.dumps(first) + "\n" + json.dumps(second) + "\n", encoding="utf-8")
+    assert len(_read(live)) == 2
+
+    live.write_text(json.dumps(second) + "\n", encoding="utf-8")
+    assert _read(live) == [second]
+
+
+def test_read_latest_lines_follows_replaced_file(tmp_path: pathlib.Path, fresh_reader):
+    live = tmp_path / "live.json"
+    first = _message("HHS Region 01", "Male", 188.2, 0)
+    second = _message("HHS Region 02", "Female", 42.0, 1)
+
+    live.write_text(json.dumps(first) + "\n", encoding="utf-8")
+    assert _read(live) == [first]
+
+    replacement = tmp_path / "replacement.json"
+    replacement.write_text(json.dumps(second) + "\n" + json.dumps(first) + "\n", encoding="utf-8")
+    replacement.replace(live)
+    assert _read(live) == [second, first]
+
+
+#####################################
+# Background Ingestion
+#####################################
+
+
+def test_ingest_loop_stores_new_lines_until_stopped(tmp_path: pathlib.Path, fresh_reader, monkeypatch):
+    monkeypatch.setattr(consumer, "POLL_INTERVAL_SECS", 0.01)
+    db_path = tmp_path / "analytics.sqlite"
+    live = tmp_path / "live.json"
+    consumer.init_db(db_path)
+    live.write_bytes(b"".join(_lines(_message("HHS Region 05", "Female", 75.0, 0))))
+
+    writer = consumer.connect_db(db_path)
+    reader = consumer.connect_db(db_path)
+    stop = threading.Event()
+    worker = threading.Thread(target=consumer.ingest_loop, args=(live, writer.cursor(), stop))
+    worker.start()
+    try:
+        deadline = time.monotonic() + 5
+        count = 0
+        while count == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+            (count,) = reader.execute("SELECT COUNT(*) FROM mortality_analytics;").fetchone()
+    finally:
+        stop.set()
+        worker.join(timeout=5)
+        writer.close()
+        reader.close()
+
+    assert count == 1
+    assert not worker.is_alive()
+
+
+def test_ingest_loop_survives_unexpected_errors(tmp_path: pathlib.Path, monkeypatch):
+    monkeypatch.setattr(consumer, "POLL_INTERVAL_SECS", 0.01)
+    calls = []
+
+    def flaky_read(data_file):
+        calls.append(data_file)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return []
+
+    monkeypatch.setattr(consumer, "read_latest_lines", flaky_read)
+    stop = threading.Event()
+    worker = threading.Thread(target=consumer.ingest_loop, args=(tmp_path / "live.json", None, stop))
+    worker.start()
+    try:
+        deadline = time.monotonic() + 5
+        while len(calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        stop.set()
+        worker.join(timeout=5)
+
+    assert len(calls) >= 2
@@ -0,0 +1,280 @@
+"""
+tests/test_producer_mortality.py
+
+Lightweight tests for the mortality data producer.
+Uses temp paths so the live data file and database are never touched.
+
+Usage:
+  pytest -q
+"""
+
+#####################################
+# Imports
+#####################################
+
+import io
+import json
+import pathlib
+import queue
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from producers import producer_mortality_anjana as producer
+
+#####################################
+# Helper Functions
+#####################################
+
+
+def _message(minute: int) -> dict:
+    return {
+        "message": "In HHS Region 01, Urban Male population reported Heart disease mortality at 188.2 (SE 1.0).",
+        "author": "HHS_Region_01",
+        "timestamp": f"2025-09-27 00:{minute:02d}:00",
+        "category": "heart_disease",
+        "region": "HHS Region 01",
+        "status": "Urban",
+        "sex": "Male",
+        "cause": "Heart disease",
+        "rate": 188.2,
+        "se": 1.0,
+    }
+
+
+def _row(minute: int) -> tuple:
+    return tuple(_message(minute).values())
+
+
+def _line(minute: int) -> bytes:
+    return (json.dumps(_message(minute)) + "\n").encode("utf-8")
+
+
+def _count(db_path: pathlib.Path) -> int:
+    with sqlite3.connect(str(db_path)) as conn:
+        (count,) = conn.execute("SELECT COUNT(*) FROM mortality_messages;").fetchone()
+    return count
+
+
+#####################################
+# SQLite Batching
+#####################################
+
+
+def test_sqlite_batcher_is_due_at_batch_size(tmp_path: pathlib.Path):
+    db_path = tmp_path / "producer.sqlite"
+    producer.init_sqlite_db(db_path)
+    batcher = producer._SqliteBatcher(db_path, batch_size=3, flush_interval_secs=3600)
+    try:
+        batcher.add(_row(0))
+        batcher.add(_row(1))
+        assert not batcher.flush_due()
+        batcher.add(_row(2))
+        assert batcher.flush_due()
+        assert _count(db_path) == 0
+        assert batcher.flush()
+        assert _count(db_path) == 3
+        assert not batcher.flush_due()
+    finally:
+        batcher.close()
+
+
+def test_sqlite_batcher_keeps_rows_while_database_is_locked(tmp_path: pathlib.Path):
+    db_path = tmp_path / "producer.sqlite"
+    producer.init_sqlite_db(db_path)
+    batcher = producer._SqliteBatcher(db_path, batch_size=1, flush_interval_secs=3600)
+    batcher.conn.execute("PRAGMA busy_timeout=0")
+    locker = sqlite3.connect(str(db_path), isolation_level=None)
+    try:
+        locker.execute("BEGIN EXCLUSIVE")
+        batcher.add(_row(0))
+        assert not batcher.flush()
+        assert len(batcher.buf) == 1
+        assert not batcher.flush_due()  # backs off until the next interval
+        locker.execute("COMMIT")
+
+        assert batcher.flush()
+        assert batcher.buf == []
+    finally:
+        locker.close()
+        batcher.close()
+
+    assert _count(db_path) == 1
+
+
+def test_sqlite_batcher_close_flushes_remaining_rows(tmp_path: pathlib.Path):
+    db_path = tmp_path / "producer.sqlite"
+    producer.init_sqlite_db(db_path)
+    batcher = producer._SqliteBatcher(db_path, batch_size=100, flush_interval_secs=3600)
+    batcher.add(_row(0))
+    batcher.close()
+
+    assert _count(db_path) == 1
+
+
+def test_init_sqlite_db_uses_wal_without_autoincrement(tmp_path: pathlib.Path):
+    db_path = tmp_path / "producer.sqlite"
+    producer.init_sqlite_db(db_path)
+    batcher = producer._SqliteBatcher(db_path, batch_size=1)
+    batcher.add(_row(0))
+    batcher.close()
+
+    with sqlite3.connect(str(db_path)) as conn:
+        (journal_mode,) = conn.execute("PRAGMA journal_mode;").fetchone()
+        tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table';")}
+    assert journal_mode == "wal"
+    assert "sqlite_sequence" not in tables
+
+
+#####################################
+# Live File Output
+#####################################
+
+
+def test_emit_to_file_writes_one_json_line_per_message():
+    fh = io.BytesIO()
+    producer.emit_to_file(_line(0), fh=fh)
+    producer.emit_to_file(_line(1), fh=fh)
+
+    lines = fh.getvalue().splitlines()
+    assert [json.loads(line)["timestamp"] for line in lines] == [
+        "2025-09-27 00:00:00",
+        "2025-09-27 00:01:00",
+    ]
+
+
+def test_writer_drains_queue_until_sentinel(tmp_path: pathlib.Path):
+    db_path = tmp_path / "producer.sqlite"
+    producer.init_sqlite_db(db_path)
+    batcher = producer._SqliteBatcher(db_path, batch_size=2, flush_interval_secs=3600)
+    live_file = io.BytesIO()
+    write_queue: queue.Queue = queue.Queue(maxsize=4)
+
+    writer = threading.Thread(target=producer._writer, args=(write_queue, live_file, batcher))
+    writer.start()
+    for minute in range(3):
+        write_queue.put((_line(minute), _row(minute)))
+    write_queue.put(None)
+    writer.join(timeout=5)
+
+    assert not writer.is_alive()
+    assert len(live_file.getvalue().splitlines()) == 3
+    assert _count(db_path) == 2
+    batcher.close()
+    assert _count(db_path) == 3
+
+
+def test_writer_survives_failed_idle_flush(tmp_path: pathlib.Path):
+    class BrokenFile(io.BytesIO):
+        def flush(self):
+            raise OSError("disk full")
+
+    db_path = tmp_path / "producer.sqlite"
+    producer.init_sqlite_db(db_path)
+    batcher = producer._SqliteBatcher(db_path, batch_size=100, flush_interval_secs=0.01)
+    write_queue: queue.Queue = queue.Queue(maxsize=4)
+
+    writer = threading.Thread(target=producer._writer, args=(write_queue, BrokenFile(), batcher))
+    writer.start()
+    time.sleep(0.05)  # let the idle flush run and fail
+    assert writer.is_alive()
+    write_queue.put(None)
+    writer.join(timeout=5)
+    batcher.close()
+
+    assert not writer.is_alive()
+
+
+def test_enqueue_gives_up_when_writer_has_stopped(monkeypatch):
+    monkeypatch.setattr(producer, "WRITER_TIMEOUT_SECS", 0.01)
+    write_queue: queue.Queue = queue.Queue(maxsize=1)
+    write_queue.put("full")
+    dead_writer = threading.Thread(target=lambda: None)
+    dead_writer.start()
+    dead_writer.join()
+
+    with pytest.raises(RuntimeError):
+        producer._enqueue(write_queue, "next", dead_writer)
+
+
+#####################################
+# Message Generation
+#####################################
+
+
+CSV_HEADER = "rownames,Region,Status,Sex,Cause,Rate,SE\n"
+
+
+def test_generate_mortality_messages_cycles_csv_rows(tmp_path: pathlib.Path):
+    csv_path = tmp_path / "mortality.csv"
+    csv_path.write_text(
+        CSV_HEADER
+        + "1,HHS Region 01,Urban,Male,Heart disease,188.2,1\n"
+        + "2,HHS Region 02,Rural,Female,Cancer,120.5,2.3\n",
+        encoding="utf-8",
+    )
+
+    messages = producer.generate_mortality_messages(str(csv_path))
+    (first_line, first_row), (second_line, _), (third_line, _) = next(messages), next(messages), next(messages)
+    first, second, third = json.loads(first_line), json.loads(second_line), json.loads(third_line)
+
+    assert first["author"] == "HHS_Region_01"
+    assert first["category"] == "heart_disease"
+    assert first["timestamp"] == "2025-09-27 00:00:00"
+    assert "HHS Region 01" in first["message"] and "188.2" in first["message"]
+    assert second["cause"] == "Cancer" and second["rate"] == 120.5
+    assert second["timestamp"] == "2025-09-27 00:01:00"
+    assert third["region"] == "HHS Region 01"
+    assert first_line.endswith(b"\n")
+    assert first_row == tuple(first.values())
+
+
+def test_generate_mortality_messages_is_repeatable_with_seed(tmp_path: pathlib.Path, monkeypatch):
+    monkeypatch.setattr(producer, "TEMPLATE_PICK_BUFFER", 3)
+    csv_path = tmp_path / "mortality.csv"
+    csv_path.write_text(
+        CSV_HEADER + "1,HHS Region 01,Urban,Male,Heart disease,188.2,1\n",
+        encoding="utf-8",
+    )
+
+    def take(seed: int) -> list:
+        messages = producer.generate_mortality_messages(str(csv_path), seed=seed)
+        return [next(messages)[0] for _ in range(10)]
+
+    assert take(7) == take(7)
+
+
+def test_timestamps_cover_one_day_by_minute():
+    assert len(producer.TIMESTAMPS) == 24 * 60
+    assert producer.TIMESTAMPS[61] == "2025-09-27 01:01:00"
+    assert producer.TIMESTAMPS[-1] == "2025-09-27 23:59:00"
+
+
+def test_load_mortality_data_matches_without_pyarrow(tmp_path: pathlib.Path, monkeypatch):
+    csv_path = tmp_path / "mortality.csv"
+    csv_path.write_text(
+        CSV_HEADER + "1,HHS Region 01,Urban,Male,Heart disease,188.2,1\n",
+        encoding="utf-8",
+    )
+    loaded = producer.load_mortality_data(str(csv_path))
+
+    monkeypatch.setattr(producer, "pac", None)
+    assert producer.load_mortality_data(str(csv_path)) == loaded
+    assert loaded.ses == [1.0]
+    assert loaded.categories == ["heart_disease"]
+
+
+def test_load_mortality_data_interns_author_and_category(tmp_path: pathlib.Path):
+    csv_path = tmp_path / "mortality.csv"
+    csv_path.write_text(
+        CSV_HEADER
+        + "1,HHS Region 01,Urban,Male,Heart disease,188.2,1\n"
+        + "2,HHS Region 01,Rural,Female,Heart disease,150.4,1.8\n",
+        encoding="utf-8",
+    )
+    loaded = producer.load_mortality_data(str(csv_path))
+
+    assert loaded.authors[0] is loaded.authors[1]
+    assert loaded.categories[0] is loaded.categories[1]
@@ -0,0 +1,133 @@
+"""
+tests/test_utils_producer.py
+
+Lightweight tests for the Kafka admin helpers in utils_producer.
+Swaps in a fake admin client so no broker is needed.
+
+Usage:
+  pytest -q
+"""
+
+#####################################
+# Imports
+#####################################
+
+import pytest
+
+from utils import utils_producer
+
+#####################################
+# Helper Functions
+#####################################
+
+
+class _FakeAdmin:
+    instances = 0
+    list_calls = 0
+    topics = {"buzzline"}
+
+    def __init__(self, **kwargs):
+        type(self).instances += 1
+        self.kwargs = kwargs
+        self.closed = False
+
+    def describe_cluster(self):
+        return {"brokers": [{"host": "fake"}]}
+
+    def list_topics(self):
+        type(self).list_calls += 1
+        return list(self.topics)
+
+    def create_topics(self, new_topics):
+        self.topics.update(topic.name for topic in new_topics)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_admin(monkeypatch):
+    _FakeAdmin.instances = 0
+    _FakeAdmin.list_calls = 0
+    _FakeAdmin.topics = {"buzzline"}
+    monkeypatch.setattr(utils_producer, "KafkaAdminClient", _FakeAdmin)
+    utils_producer._reset_admin()
+    utils_producer._invalidate_topics()
+    yield _FakeAdmin
+    utils_producer._reset_admin()
+    utils_producer._invalidate_topics()
+
+
+#####################################
+# Admin Client Reuse
+#####################################
+
+
+def test_helpers_share_one_admin_client(fake_admin):
+    assert utils_producer.check_kafka_service_is_ready()
+    assert utils_producer.check_kafka_service_is_ready()
+    assert utils_producer.is_topic_available("buzzline")
+    assert not utils_producer.is_topic_available("missing")
+
+    # One default client plus one topic_check client
+    assert fake_admin.instances == 2
+
+
+def test_is_topic_available_applies_its_timeout(fake_admin):
+    utils_producer.check_kafka_service_is_ready()
+    utils_producer.is_topic_available("buzzline", timeout_ms=1234)
+
+    admin = utils_producer._get_admin(client_id="topic_check", request_timeout_ms=1234)
+    assert admin.kwargs["request_timeout_ms"] == 1234
+    assert admin.kwargs["client_id"] == "topic_check"
+    assert "request_timeout_ms" not in utils_producer._get_admin().kwargs
+
+
+def test_reset_admin_closes_and_reconnects(fake_admin):
+    first = utils_producer._get_admin()
+    utils_producer._reset_admin()
+
+    assert first.closed
+    assert utils_producer._get_admin() is not first
+    assert fake_admin.instances == 2
+
+
+#####################################
+# Topic Cache
+#####################################
+
+
+def test_topic_lookups_reuse_cached_list(fake_admin):
+    admin = utils_producer._get_admin()
+    assert utils_producer.is_topic_available("buzzline")
+    assert utils_producer.is_topic_available("buzzline")
+    assert utils_producer._topic_exists(admin, "buzzline")
+
+    assert fake_admin.list_calls == 1
+    assert utils_producer._topic_exists(admin, "buzzline", refresh=True)
+    assert fake_admin.list_calls == 2
+
+
+def test_create_topic_invalidates_cache(fake_admin):
+    assert not utils_producer.is_topic_available("fresh")
+
+    utils_producer.create_kafka_topic("fresh")
+
+    assert utils_producer.is_topic_available("fresh")
+
+
+#####################################
+# Producer Settings
+#####################################
+
+
+def test_create_kafka_producer_batches_and_passes_bytes_through(monkeypatch):
+    captured = {}
+    monkeypatch.setattr(utils_producer, "KafkaProducer", lambda **kwargs: captured.update(kwargs) or kwargs)
+
+    utils_producer.create_kafka_producer()
+
+    assert captured["linger_ms"] == 20 and captured["acks"] == 1
+    serialize = captured["value_serializer"]
+    assert serialize("hello") == b"hello"
+    assert serialize(b"raw") == b"raw"
@@ -90,6 +90,29 @@ def get_sqlite_path() -> pathlib.Path:
     return sqlite_path
 
 
+def get_analytics_db_path() -> pathlib.Path:
+    """Fetch ANALYTICS_DB_FILE_NAME from environment or use default."""
+    analytics_path = get_base_data_path() / os.getenv(
+        "ANALYTICS_DB_FILE_NAME", "mortality_analytics.sqlite"
+    )
+    logger.info(f"ANALYTICS_DB_PATH: {analytics_path}")
+    return analytics_path
+
+
+def get_high_rate_threshold() -> float:
+    """Fetch HIGH_RATE_THRESHOLD from environment or use default."""
+    threshold = float(os.getenv("HIGH_RATE_THRESHOLD", 100))
+    logger.info(f"HIGH_RATE_THRESHOLD: {threshold}")
+    return threshold
+
+
+def get_trend_cause() -> str:
+    """Fetch TREND_CAUSE from environment or use default."""
+    cause = os.getenv("TREND_CAUSE", "Heart disease")
+    logger.info(f"TREND_CAUSE: {cause}")
+    return cause
+
+
 def get_database_type() -> str:
     """Fetch DATABASE_TYPE from environment or use default."""
     db_type = os.getenv("DATABASE_TYPE", "sqlite")
@@ -168,6 +191,9 @@ if __name__ == "__main__":
         get_base_data_path()
         get_live_data_path()
         get_sqlite_path()
+        get_analytics_db_path()
+        get_high_rate_threshold()
+        get_trend_cause()
         get_database_type()
         get_postgres_host()
         get_postgres_port()
@@ -8,13 +8,16 @@ Producers send messages to a Kafka topic.
 # Import Modules
 #####################################
 
+import atexit
 import os
 import sys
+import threading
 import time
 from typing import Callable, Optional, Any
 
 from dotenv import load_dotenv
 from kafka import KafkaProducer, errors
+from kafka.codec import has_lz4
 from kafka.admin import KafkaAdminClient, NewTopic
 
 from utils.utils_logger import logger
@@ -25,6 +28,24 @@ from utils.utils_logger import logger
 
 DEFAULT_KAFKA_BROKER_ADDRESS = "localhost:9092"
 
+# Let the producer batch records per partition instead of sending one request each;
+# lz4 is only requested when its codec is installed
+KAFKA_PRODUCER_SETTINGS = {
+    "linger_ms": 20,
+    "batch_size": 131072,
+    "acks": 1,
+    "compression_type": "lz4" if has_lz4() else None,
+}
+
+# Admin connections shared by the helpers, one per distinct client settings;
+# reset after errors so the next call reconnects
+_admin_clients: dict[tuple, KafkaAdminClient] = {}
+_admin_lock = threading.Lock()
+
+# Topic names from the last list_topics() call, reused for a short while
+TOPIC_CACHE_TTL_SECS = 2.0
+_topic_cache: Optional[tuple[float, set[str]]] = None
+
 #####################################
 # Helper Functions
 #####################################
@@ -37,6 +58,51 @@ def get_kafka_broker_address():
     return broker_address
 
 
+def _get_admin(client_id: Optional[str] = None, request_timeout_ms: Optional[int] = None) -> KafkaAdminClient:
+    """Return the cached admin client for these settings, connecting on first use."""
+    key = (client_id, request_timeout_ms)
+    with _admin_lock:
+        admin = _admin_clients.get(key)
+        if admin is None:
+            kwargs: dict[str, Any] = {}
+            if client_id is not None:
+                kwargs["client_id"] = client_id
+            if request_timeout_ms is not None:
+                kwargs["request_timeout_ms"] = request_timeout_ms
+            admin = KafkaAdminClient(bootstrap_servers=get_kafka_broker_address(), **kwargs)
+            _admin_clients[key] = admin
+        return admin
+
+
+def _reset_admin() -> None:
+    """Close and drop every cached admin client."""
+    with _admin_lock:
+        for admin in _admin_clients.values():
+            try:
+                admin.close()
+            except Exception:
+                pass
+        _admin_clients.clear()
+
+
+atexit.register(_reset_admin)
+
+
+def _topics(admin: KafkaAdminClient, refresh: bool = False) -> set[str]:
+    """Return cluster topic names, fetching again once the cache is older than the TTL."""
+    global _topic_cache
+    now = time.monotonic()
+    if refresh or _topic_cache is None or now - _topic_cache[0] >= TOPIC_CACHE_TTL_SECS:
+        _topic_cache = (now, set(admin.list_topics()))
+    return _topic_cache[1]
+
+
+def _invalidate_topics() -> None:
+    """Drop cached topic names after creating or deleting a topic."""
+    global _topic_cache
+    _topic_cache = None
+
+
 #####################################
 # Kafka Readiness Check
 #####################################
@@ -44,15 +110,14 @@ def get_kafka_broker_address():
 
 def check_kafka_service_is_ready():
     """Check if Kafka is ready by connecting to the broker and fetching metadata."""
-    kafka_broker = get_kafka_broker_address()
     try:
-        admin_client = KafkaAdminClient(bootstrap_servers=kafka_broker)
+        admin_client = _get_admin()
         cluster_info: dict = admin_client.describe_cluster()
         logger.info(f"Kafka is ready. Brokers: {cluster_info}")
-        admin_client.close()
         return True
     except errors.KafkaError as e:
         logger.error(f"Error checking Kafka: {e}")
+        _reset_admin()
         return False
 
 
@@ -79,14 +144,16 @@ def create_kafka_producer(
 ) -> Optional[KafkaProducer]:
     kafka_broker = get_kafka_broker_address()
     if value_serializer is None:
-        def default_value_serializer(x: str) -> bytes:
-            return x.encode("utf-8")
+        def default_value_serializer(x: str | bytes) -> bytes:
+            # Already-encoded payloads pass straight through
+            return x if isinstance(x, bytes) else x.encode("utf-8")
         value_serializer = default_value_serializer
     try:
         logger.info(f"Connecting to Kafka broker at {kafka_broker}...")
         producer = KafkaProducer(
             bootstrap_servers=kafka_broker,
             value_serializer=value_serializer,
+            **KAFKA_PRODUCER_SETTINGS,
         )
         logger.info("Kafka producer successfully created.")
         return producer
@@ -95,9 +162,9 @@ def create_kafka_producer(
         return None
 
 
-def _topic_exists(admin: KafkaAdminClient, topic_name: str) -> bool:
+def _topic_exists(admin: KafkaAdminClient, topic_name: str, refresh: bool = False) -> bool:
     try:
-        return topic_name in set(admin.list_topics())
+        return topic_name in _topics(admin, refresh=refresh)
     except Exception:
         return False
 
@@ -106,10 +173,11 @@ def _delete_topic_if_exists(admin: KafkaAdminClient, topic_name: str) -> None:
     try:
         if _topic_exists(admin, topic_name):
             admin.delete_topics([topic_name])
+            _invalidate_topics()
             logger.info(f"Requested deletion of topic '{topic_name}'.")
             deadline = time.time() + 10
             while time.time() < deadline:
-                if not _topic_exists(admin, topic_name):
+                if not _topic_exists(admin, topic_name, refresh=True):
                     break
                 time.sleep(0.2)
     except Exception as e:
@@ -117,43 +185,37 @@ def _delete_topic_if_exists(admin: KafkaAdminClient, topic_name: str) -> None:
 
 
 def create_kafka_topic(topic_name, group_id=None) -> None:
-    kafka_broker = get_kafka_broker_address()
-    admin_client = None
     try:
-        admin_client = KafkaAdminClient(bootstrap_servers=kafka_broker)
+        admin_client = _get_admin()
         if _topic_exists(admin_client, topic_name):
             logger.info(f"Topic '{topic_name}' already exists. Recreating fresh...")
             _delete_topic_if_exists(admin_client, topic_name)
         new_topic = NewTopic(name=topic_name, num_partitions=1, replication_factor=1)
         admin_client.create_topics([new_topic])
+        _invalidate_topics()
         logger.info(f"Topic '{topic_name}' created successfully.")
     except Exception as e:
         logger.error(f"Error managing topic '{topic_name}': {e}")
+        _reset_admin()
         sys.exit(1)
-    finally:
-        if admin_client is not None:
-            try:
-                admin_client.close()
-            except Exception:
-                pass
 
 
 def clear_kafka_topic(topic_name: str, group_id: Optional[str] = None):
-    kafka_broker = get_kafka_broker_address()
-    admin_client = KafkaAdminClient(bootstrap_servers=kafka_broker)
     try:
+        admin_client = _get_admin()
         logger.info(f"Clearing topic '{topic_name}' by deleting and recreating it.")
-        if topic_name in admin_client.list_topics():
+        if topic_name in _topics(admin_client):
             admin_client.delete_topics([topic_name])
+            _invalidate_topics()
             logger.info(f"Deleted topic '{topic_name}'.")
             time.sleep(2)
         new_topic = NewTopic(name=topic_name, num_partitions=1, replication_factor=1)
         admin_client.create_topics([new_topic])
+        _invalidate_topics()
         logger.info(f"Recreated topic '{topic_name}' successfully.")
     except Exception as e:
         logger.error(f"Error clearing topic '{topic_name}': {e}")
-    finally:
-        admin_client.close()
+        _reset_admin()
 
 
 #####################################
@@ -164,27 +226,16 @@ def clear_kafka_topic(topic_name: str, group_id: Optional[str] = None):
 def is_topic_available(topic: str, timeout_ms: int = 5000) -> bool:
     """Return True if topic exists on the Kafka cluster."""
     try:
-        kafka_broker = get_kafka_broker_address()
-        admin = KafkaAdminClient(
-            bootstrap_servers=kafka_broker,
-            client_id="topic_check",
-            request_timeout_ms=timeout_ms,
-        )
-        try:
-            topics = set(admin.list_topics())
-        finally:
-            try:
-                admin.close()
-            except Exception:
-                pass
-        exists = topic in topics
+        admin = _get_admin(client_id="topic_check", request_timeout_ms=timeout_ms)
+        exists = topic in _topics(admin)
         if exists:
-            logger.info(f"is_topic_available: topic '{topic}' found on {kafka_broker}.")
+            logger.info(f"is_topic_available: topic '{topic}' found.")
         else:
-            logger.warning(f"is_topic_available: topic '{topic}' NOT found on {kafka_broker}.")
+            logger.warning(f"is_topic_available: topic '{topic}' NOT found.")
         return exists
     except Exception as e:
         logger.error(f"is_topic_available: failed to check topic '{topic}': {e}")
+        _reset_admin()
         return False
 
 